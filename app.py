@@ -6,13 +6,18 @@ This creates a web server that displays sentiment analysis and price correlation
 Created by: Renesh Ravi
 """
 
+import os
 import sys
 from pathlib import Path
 from flask import Flask, render_template, jsonify, request
 import logging
 import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
+import pandas as pd
 
 # Add src directory to path
 sys.path.append(str(Path(__file__).parent / "src"))
@@ -20,11 +25,21 @@ sys.path.append(str(Path(__file__).parent / "src"))
 # Import our modules
 from src.scrapers.coindesk_scraper import CoindeskScraper
 from src.analysis.sentiment_analyzer import SentimentAnalyzer
+from src.analysis.sentiment_streamer import SentimentStreamer
 from src.utilities.bitcoin_price_fetcher import BitcoinPriceFetcher
 from src.analysis.correlation_analyzer import CorrelationAnalyzer
+from src.utilities.json_provider import ORJSONProvider, iter_json_with_list
+from src.utilities.ttl_cache import TTLCache
+from config.settings import (
+    SENTIMENT_BATCH_SIZE, SENTIMENT_MAX_LATENCY, SENTIMENT_QUANTIZE,
+    SENTIMENT_COMPILE, SENTIMENT_NUM_THREADS, SENTIMENT_FP16, SENTIMENT_ONNX,
+    SENTIMENT_CACHE_SIZE, PRICE_CACHE_TTL, ANALYSIS_CACHE_TTL, WARMUP_ON_START,
+    MAX_PAGES_PER_SOURCE
+)
 
 # Create Flask application
 app = Flask(__name__)
+app.json = ORJSONProvider(app)  # orjson handles numpy types natively
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,25 +48,214 @@ logger = logging.getLogger(__name__)
 # Global instances (created once when server starts)
 scraper = CoindeskScraper()
 analyzer = None  # Don't load yet
-price_fetcher = BitcoinPriceFetcher()
+streamer = None
+analyzer_lock = threading.Lock()
+price_fetcher = BitcoinPriceFetcher(cache_ttl=PRICE_CACHE_TTL)
 correlation_analyzer = CorrelationAnalyzer()
 
+# Shared pool for overlapping blocking work (scraping, model loading)
+executor = ThreadPoolExecutor(max_workers=4)
+
+def in_gunicorn_master():
+    """
+    True in the gunicorn master process (set up by gunicorn.conf.py). The
+    Procfile doesn't preload the app, so this only matters if --preload is
+    added back: the master would then import the app before forking workers
+    """
+    return os.environ.get('GUNICORN_MASTER_PID') == str(os.getpid())
+
 def get_analyzer():
     """Lazy load sentiment analyzer only when needed"""
     global analyzer
-    if analyzer is None:
-        logger.info("Loading sentiment analyzer (first time)...")
-        analyzer = SentimentAnalyzer()
+    with analyzer_lock:
+        if analyzer is None:
+            # Picking the device and loading/compiling the model touch CUDA
+            # and torch's thread pools, which must not happen before a fork
+            if in_gunicorn_master():
+                raise RuntimeError("finBERT must not be loaded in the gunicorn "
+                                   "master; it loads in each worker after fork")
+            logger.info("Loading sentiment analyzer (first time)...")
+            analyzer = SentimentAnalyzer(
+                quantize=SENTIMENT_QUANTIZE,
+                compile_model=SENTIMENT_COMPILE,
+                num_threads=SENTIMENT_NUM_THREADS or None,
+                fp16=SENTIMENT_FP16,
+                use_onnx=SENTIMENT_ONNX,
+                result_cache_size=SENTIMENT_CACHE_SIZE
+            )
     return analyzer
 
-# Cache for storing recent results
+def get_streamer():
+    """Lazy create the micro-batching front end shared by all requests"""
+    global streamer
+    sentiment_analyzer = get_analyzer()
+    with analyzer_lock:
+        if streamer is None:
+            streamer = SentimentStreamer(
+                sentiment_analyzer,
+                batch_size=SENTIMENT_BATCH_SIZE,
+                max_latency=SENTIMENT_MAX_LATENCY
+            )
+    return streamer
+
+def warm_up_prices():
+    """
+    Prefetch 30 days of prices so the first requests don't wait on
+    CoinGecko. Must run in the process that serves requests (after the fork
+    under gunicorn, see post_fork in gunicorn.conf.py): the fetch leaves a
+    pooled keep-alive connection in price_fetcher.session, and a forked
+    worker would share that socket with its parent.
+    """
+    logger.info("Warming up: prefetching prices...")
+    try:
+        price_fetcher.get_historical_prices(30)
+    except Exception as e:
+        logger.warning("Price warm-up failed: %s", e)
+
+def warm_up_model():
+    """
+    Start loading finBERT in the background so the first analysis doesn't
+    pay for it. Must run in the process that serves requests (after the
+    fork under gunicorn, see post_fork in gunicorn.conf.py): loading moves
+    the model to the device and may compile it, which initializes CUDA and
+    torch's thread pools, and neither survives a fork.
+    """
+    logger.info("Warming up: loading finBERT in the background...")
+    future = executor.submit(get_analyzer().load_model)
+
+    def log_failure(done):
+        if done.exception() is not None:
+            logger.warning("Model warm-up failed: %s", done.exception())
+
+    future.add_done_callback(log_failure)
+
+# Cache for storing recent results. Always replaced as a whole under
+# cache_lock; readers take a snapshot via get_cache_snapshot()
+cache_lock = threading.Lock()
 cache = {
     'last_analysis': None,
     'last_update': None,
-    'headlines_data': []
+    'headlines_data': [],
+    # Same headlines as parallel arrays (day bucket + score), so daily
+    # aggregation is a vectorized unique/bincount
+    'headlines_arrays': {
+        'date': np.array([], dtype='datetime64[D]'),
+        'sentiment_score': np.array([], dtype=np.float64)
+    }
 }
 
 
+# Completed analyses keyed by request parameters, so repeating the same
+# request within ANALYSIS_CACHE_TTL skips scraping and inference
+analysis_cache = TTLCache(maxsize=4, ttl=ANALYSIS_CACHE_TTL)
+
+
+def get_cache_snapshot():
+    """
+    Consistent shallow copy of the cached results for one request
+    """
+    with cache_lock:
+        return dict(cache)
+
+
+def get_snapshot_etag(snapshot):
+    """
+    ETag for responses derived from the cached analysis; changes whenever a
+    new analysis is published
+    """
+    return hashlib.md5(str(snapshot['last_update']).encode()).hexdigest()
+
+
+def not_modified_response(etag):
+    """
+    Empty 304 reply for a client that already holds the current data
+    """
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def with_etag(response, etag):
+    """
+    Tag a cached-data response so clients can revalidate it cheaply.
+    no-cache makes browsers revalidate every time, so a fresh analysis is
+    picked up immediately while unchanged data costs only a 304.
+    """
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def stream_headlines_response(payload):
+    """
+    Stream a JSON response whose 'headlines' list is serialized in chunks
+    """
+    return app.response_class(
+        iter_json_with_list(payload, 'headlines'),
+        mimetype='application/json'
+    )
+
+
+def build_headlines_arrays(headlines_data):
+    """
+    Build the cached day/score arrays used for daily sentiment aggregation
+    """
+    published_at = pd.to_datetime([h['published_at'] for h in headlines_data], format='ISO8601')
+    return {
+        'date': published_at.values.astype('datetime64[D]'),
+        'sentiment_score': np.fromiter((h['sentiment_score'] for h in headlines_data),
+                                       dtype=np.float64, count=len(headlines_data))
+    }
+
+
+def get_daily_sentiment(arrays):
+    """
+    Daily average sentiment ('mean') and headline count ('size'), indexed by
+    'YYYY-MM-DD' and sorted by date
+    """
+    days, inverse = np.unique(arrays['date'], return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=arrays['sentiment_score'])
+    return pd.DataFrame(
+        {'mean': sums / counts, 'size': counts},
+        index=np.datetime_as_string(days, unit='D')
+    )
+
+
+def get_int_param(data, name, default, minimum=1, maximum=None):
+    """
+    Read an integer request parameter, accepting numeric strings like "50".
+    Raises ValueError for anything else (lists, dicts, fractions, booleans)
+    or values outside minimum..maximum, so bad input can't reach caches or
+    the scraper
+    """
+    value = data.get(name, default)
+    if isinstance(value, str) and value.strip().isdecimal():
+        value = int(value)
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    if type(value) is not int or value < minimum:
+        raise ValueError(f"'{name}' must be an integer of at least {minimum}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"'{name}' must be at most {maximum}")
+    return value
+
+
+def get_price_result(future):
+    """
+    Wait up to one CoinGecko request timeout for a background current-price
+    fetch. Returns None if it is slower (rate-limit waits, Retry-After,
+    retries) or fails, so a finished analysis isn't held back; the
+    dashboard then asks /api/bitcoin-price itself
+    """
+    try:
+        return future.result(timeout=price_fetcher.request_timeout)
+    except Exception as e:
+        logger.warning("Current price not ready for the analysis: %r", e)
+        return None
+
+
 # ============================================================================
 # DASHBOARD ROUTES
 # ============================================================================
@@ -75,17 +279,52 @@ def run_sentiment_analysis():
     """
     try:
         data = request.get_json() or {}
-        num_headlines = data.get('num_headlines', 50)
-        days_back = data.get('days_back', 7)
-        max_pages = data.get('max_pages', 3)
+        # Upper bounds match the dashboard's inputs
+        try:
+            num_headlines = get_int_param(data, 'num_headlines', 50,
+                                          maximum=500)
+            days_back = get_int_param(data, 'days_back', 7, maximum=60)
+            max_pages = get_int_param(data, 'max_pages', 3,
+                                      maximum=MAX_PAGES_PER_SOURCE)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        logger.info("Starting analysis: %s headlines, %s days, %s pages",
+                    num_headlines, days_back, max_pages)
+
+        # The live price goes out with every analysis, cached or not, and
+        # is fetched while the analysis is looked up or computed
+        current_price_future = executor.submit(price_fetcher.get_current_price)
 
-        logger.info(f"Starting analysis: {num_headlines} headlines, {days_back} days, {max_pages} pages")
+        cache_key = (num_headlines, days_back, max_pages)
+        cached_entry = analysis_cache.get(cache_key)
 
-        # Step 1: Scrape headlines
+        if cached_entry is not None:
+            logger.info("Reusing analysis from %s", cached_entry['last_update'])
+            with cache_lock:
+                cache.update(cached_entry)
+
+            return stream_headlines_response({
+                'success': True,
+                'summary': cached_entry['last_analysis'],
+                'headlines': cached_entry['headlines_data'],
+                'analysis_date': cached_entry['last_update'],
+                'current_price': get_price_result(current_price_future)
+            })
+
+        # Step 1: Scrape headlines while finBERT loads in the background.
+        # 30-day prices are fetched alongside, so the dashboard's
+        # correlation step (30 days by default) finds them already cached
         logger.info("Scraping headlines...")
+        model_future = executor.submit(get_analyzer().load_model)
+        executor.submit(price_fetcher.get_historical_prices, 30)
         headlines = scraper.get_bitcoin_headlines(
             days_back=days_back,
-            max_pages_per_source=max_pages
+            max_pages_per_source=max_pages,
+            limit=num_headlines
         )
 
         if not headlines:
@@ -96,8 +335,9 @@ def run_sentiment_analysis():
 
         # Step 2: Analyze sentiment
         logger.info("Analyzing sentiment...")
+        model_future.result()
         headline_texts = [h['title'] for h in headlines]
-        sentiment_results = get_analyzer().analyze_batch(headline_texts)
+        sentiment_results = get_streamer().analyze_batch(headline_texts)
 
         # Step 3: Combine data
         combined_data = []
@@ -116,20 +356,29 @@ def run_sentiment_analysis():
                 }
                 combined_data.append(combined_item)
 
-        # Update cache
-        cache['last_analysis'] = sentiment_results['summary']
-        cache['last_update'] = datetime.now().isoformat()
-        cache['headlines_data'] = combined_data
+        # Update cache: build the full entry first, then swap it in at once
+        # so concurrent readers never see a half-updated analysis
+        analysis_date = datetime.now().isoformat()
+        new_entry = {
+            'last_analysis': sentiment_results['summary'],
+            'last_update': analysis_date,
+            'headlines_data': combined_data,
+            'headlines_arrays': build_headlines_arrays(combined_data)
+        }
+        with cache_lock:
+            cache.update(new_entry)
+        analysis_cache.set(cache_key, new_entry)
 
-        return jsonify({
+        return stream_headlines_response({
             'success': True,
             'summary': sentiment_results['summary'],
             'headlines': combined_data,
-            'analysis_date': datetime.now().isoformat()
+            'analysis_date': analysis_date,
+            'current_price': get_price_result(current_price_future)
         })
 
     except Exception as e:
-        logger.error(f"Analysis failed: {e}")
+        logger.error("Analysis failed: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -141,11 +390,16 @@ def get_summary():
     """
     Get cached summary data
     """
-    return jsonify({
-        'summary': cache['last_analysis'],
-        'last_update': cache['last_update'],
-        'headlines_count': len(cache['headlines_data'])
-    })
+    snapshot = get_cache_snapshot()
+    etag = get_snapshot_etag(snapshot)
+    if request.if_none_match.contains(etag):
+        return not_modified_response(etag)
+
+    return with_etag(jsonify({
+        'summary': snapshot['last_analysis'],
+        'last_update': snapshot['last_update'],
+        'headlines_count': len(snapshot['headlines_data'])
+    }), etag)
 
 
 @app.route('/api/headlines')
@@ -153,10 +407,15 @@ def get_headlines():
     """
     Get detailed headline data
     """
-    return jsonify({
-        'headlines': cache['headlines_data'],
-        'last_update': cache['last_update']
-    })
+    snapshot = get_cache_snapshot()
+    etag = get_snapshot_etag(snapshot)
+    if request.if_none_match.contains(etag):
+        return not_modified_response(etag)
+
+    return with_etag(stream_headlines_response({
+        'headlines': snapshot['headlines_data'],
+        'last_update': snapshot['last_update']
+    }), etag)
 
 
 @app.route('/api/sentiment-trend')
@@ -164,30 +423,20 @@ def get_sentiment_trend():
     """
     Get sentiment trend over time (daily averages)
     """
-    if not cache['headlines_data']:
-        return jsonify({'dates': [], 'sentiment_scores': []})
-
-    date_sentiments = {}
-    for headline in cache['headlines_data']:
-        date_str = headline['published_at'][:10]
-
-        if date_str not in date_sentiments:
-            date_sentiments[date_str] = []
+    snapshot = get_cache_snapshot()
+    etag = get_snapshot_etag(snapshot)
+    if request.if_none_match.contains(etag):
+        return not_modified_response(etag)
 
-        date_sentiments[date_str].append(headline['sentiment_score'])
+    if not snapshot['headlines_data']:
+        return with_etag(jsonify({'dates': [], 'sentiment_scores': []}), etag)
 
-    dates = []
-    sentiment_scores = []
+    daily_sentiment = get_daily_sentiment(snapshot['headlines_arrays'])
 
-    for date_str in sorted(date_sentiments.keys()):
-        dates.append(date_str)
-        avg_sentiment = sum(date_sentiments[date_str]) / len(date_sentiments[date_str])
-        sentiment_scores.append(avg_sentiment)
-
-    return jsonify({
-        'dates': dates,
-        'sentiment_scores': sentiment_scores
-    })
+    return with_etag(jsonify({
+        'dates': daily_sentiment.index.tolist(),
+        'sentiment_scores': daily_sentiment['mean'].tolist()
+    }), etag)
 
 
 # ============================================================================
@@ -215,7 +464,7 @@ def get_bitcoin_price():
             })
 
     except Exception as e:
-        logger.error(f"Error fetching Bitcoin price: {e}")
+        logger.error("Error fetching Bitcoin price: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -237,11 +486,17 @@ def get_historical_prices():
         price_data = price_fetcher.get_historical_prices(days=days)
 
         if price_data:
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'price_data': price_data,
                 'days': days
             })
+            # The server already caches prices for PRICE_CACHE_TTL, so make
+            # browsers revalidate rather than stack their own max-age on
+            # top; unchanged data costs only a 304
+            response.add_etag()
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
         else:
             return jsonify({
                 'success': False,
@@ -249,7 +504,7 @@ def get_historical_prices():
             })
 
     except Exception as e:
-        logger.error(f"Error fetching historical prices: {e}")
+        logger.error("Error fetching historical prices: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -272,7 +527,9 @@ def calculate_price_correlation():
     """
     try:
         # Check if we have sentiment data
-        if not cache['headlines_data']:
+        snapshot = get_cache_snapshot()
+        headlines_data = snapshot['headlines_data']
+        if not headlines_data:
             return jsonify({
                 'success': False,
                 'error': 'No sentiment data available. Run sentiment analysis first.'
@@ -282,7 +539,7 @@ def calculate_price_correlation():
         analysis_days = data.get('days', 30)
 
         # Fetch Bitcoin price data
-        logger.info(f"Fetching {analysis_days} days of price data for correlation")
+        logger.info("Fetching %s days of price data for correlation", analysis_days)
         price_data = price_fetcher.get_historical_prices(days=analysis_days)
 
         if not price_data:
@@ -294,77 +551,71 @@ def calculate_price_correlation():
         # Calculate different types of correlations
         logger.info("Calculating daily price correlation...")
         daily_correlation = correlation_analyzer.calculate_daily_correlation(
-            cache['headlines_data'],
+            headlines_data,
             price_data
         )
 
         logger.info("Calculating price change correlation...")
         price_change_correlation = correlation_analyzer.calculate_price_change_correlation(
-            cache['headlines_data'],
+            headlines_data,
             price_data
         )
 
         logger.info("Analyzing leading indicator...")
         leading_indicator = correlation_analyzer.analyze_leading_indicator(
-            cache['headlines_data'],
+            headlines_data,
             price_data,
             lag_days=3
         )
 
-        # Calculate price statistics
-        prices = [p['price'] for p in price_data]
+        # Calculate price statistics (price_data is non-empty here)
+        prices = np.fromiter((p['price'] for p in price_data), dtype=np.float64, count=len(price_data))
+        period_avg = prices.mean()
         price_stats = {
-            'current_price': prices[-1] if prices else 0,
-            'period_min': min(prices) if prices else 0,
-            'period_max': max(prices) if prices else 0,
-            'period_avg': sum(prices) / len(prices) if prices else 0,
-            'period_change_pct': ((prices[-1] - prices[0]) / prices[0] * 100) if len(prices) > 1 else 0,
-            'volatility': float(np.std(prices) / np.mean(prices) * 100) if prices else 0
+            'current_price': prices[-1],
+            'period_min': prices.min(),
+            'period_max': prices.max(),
+            'period_avg': period_avg,
+            'period_change_pct': (prices[-1] - prices[0]) / prices[0] * 100 if prices.size > 1 else 0,
+            'volatility': prices.std() / period_avg * 100
         }
 
         # Return comprehensive results
         return jsonify({
             'success': True,
-            'analysis_period_days': int(analysis_days),
+            'analysis_period_days': analysis_days,
             'daily_correlation': {
-                'correlation': float(daily_correlation.correlation_coefficient),
-                'p_value': float(daily_correlation.p_value),
-                'significant': bool(daily_correlation.is_significant),  # Convert to Python bool
-                'sample_size': int(daily_correlation.sample_size),
-                'interpretation': str(daily_correlation.interpretation)
+                'correlation': daily_correlation.correlation_coefficient,
+                'p_value': daily_correlation.p_value,
+                'significant': daily_correlation.is_significant,
+                'sample_size': daily_correlation.sample_size,
+                'interpretation': daily_correlation.interpretation
             },
             'price_change_correlation': {
-                'correlation': float(price_change_correlation.correlation_coefficient),
-                'p_value': float(price_change_correlation.p_value),
-                'significant': bool(price_change_correlation.is_significant),  # Convert to Python bool
-                'sample_size': int(price_change_correlation.sample_size),
-                'interpretation': str(price_change_correlation.interpretation)
+                'correlation': price_change_correlation.correlation_coefficient,
+                'p_value': price_change_correlation.p_value,
+                'significant': price_change_correlation.is_significant,
+                'sample_size': price_change_correlation.sample_size,
+                'interpretation': price_change_correlation.interpretation
             },
             'leading_indicator': {
-                'lag_days': int(leading_indicator.get('lag_days', 3)),
-                'correlation_coefficient': float(leading_indicator.get('correlation_coefficient', 0)),
-                'p_value': float(leading_indicator.get('p_value', 1)),
-                'is_significant': bool(leading_indicator.get('is_significant', False)),
-                'sample_size': int(leading_indicator.get('sample_size', 0)),
-                'prediction_accuracy': float(leading_indicator.get('prediction_accuracy', 0)),
-                'predictions_correct': int(leading_indicator.get('predictions_correct', 0)),
-                'total_predictions': int(leading_indicator.get('total_predictions', 0)),
-                'interpretation': str(leading_indicator.get('interpretation', ''))
-            },
-            'price_statistics': {
-                'current_price': float(price_stats['current_price']),
-                'period_min': float(price_stats['period_min']),
-                'period_max': float(price_stats['period_max']),
-                'period_avg': float(price_stats['period_avg']),
-                'period_change_pct': float(price_stats['period_change_pct']),
-                'volatility': float(price_stats['volatility'])
+                'lag_days': leading_indicator.get('lag_days', 3),
+                'correlation_coefficient': leading_indicator.get('correlation_coefficient', 0),
+                'p_value': leading_indicator.get('p_value', 1),
+                'is_significant': leading_indicator.get('is_significant', False),
+                'sample_size': leading_indicator.get('sample_size', 0),
+                'prediction_accuracy': leading_indicator.get('prediction_accuracy', 0),
+                'predictions_correct': leading_indicator.get('predictions_correct', 0),
+                'total_predictions': leading_indicator.get('total_predictions', 0),
+                'interpretation': leading_indicator.get('interpretation', '')
             },
+            'price_statistics': price_stats,
             'price_data': price_data[-30:],
             'analysis_timestamp': datetime.now().isoformat()
         })
 
     except Exception as e:
-        logger.error(f"Correlation analysis failed: {e}")
+        logger.error("Correlation analysis failed: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -380,7 +631,8 @@ def get_combined_chart_data():
     This ensures accurate representation without interpolation.
     """
     try:
-        if not cache['headlines_data']:
+        snapshot = get_cache_snapshot()
+        if not snapshot['headlines_data']:
             return jsonify({
                 'success': False,
                 'error': 'No sentiment data available'
@@ -389,7 +641,7 @@ def get_combined_chart_data():
         days = request.args.get('days', default=30, type=int)
 
         # Get price data
-        logger.info(f"Fetching {days} days of price data for combined chart")
+        logger.info("Fetching %d days of price data for combined chart", days)
         price_data = price_fetcher.get_historical_prices(days=days)
 
         if not price_data:
@@ -398,39 +650,20 @@ def get_combined_chart_data():
                 'error': 'Failed to fetch price data'
             })
 
-        # Group sentiment by date
-        sentiment_by_date = {}
-        for headline in cache['headlines_data']:
-            date_str = headline['published_at'][:10]  # Extract YYYY-MM-DD
-
-            if date_str not in sentiment_by_date:
-                sentiment_by_date[date_str] = []
-
-            sentiment_by_date[date_str].append(headline['sentiment_score'])
+        # Average sentiment and headline count per day
+        daily = get_daily_sentiment(snapshot['headlines_arrays']).rename(
+            columns={'mean': 'sentiment', 'size': 'headline_count'})
 
-        # Calculate daily average sentiment
-        daily_sentiment = {}
-        for date, scores in sentiment_by_date.items():
-            daily_sentiment[date] = sum(scores) / len(scores)
+        logger.info("Have sentiment data for %d unique days", len(daily))
 
-        logger.info(f"Have sentiment data for {len(daily_sentiment)} unique days")
+        # Combine with price data - the inner join keeps ONLY dates with both
+        # sentiment and price, in price_data order
+        price_df = pd.DataFrame(price_data, columns=['date', 'price'])
+        combined_data = price_df.merge(
+            daily, left_on='date', right_index=True, how='inner'
+        ).to_dict('records')
 
-        # Combine with price data - ONLY include dates with both sentiment and price
-        combined_data = []
-        for price_point in price_data:
-            date = price_point['date']
-            sentiment_value = daily_sentiment.get(date)
-
-            # Only include this date if we have sentiment data for it
-            if sentiment_value is not None:
-                combined_data.append({
-                    'date': date,
-                    'price': price_point['price'],
-                    'sentiment': sentiment_value,
-                    'headline_count': len(sentiment_by_date.get(date, []))
-                })
-
-        logger.info(f"Combined chart: {len(combined_data)} days with both sentiment and price data")
+        logger.info("Combined chart: %d days with both sentiment and price data", len(combined_data))
 
         return jsonify({
             'success': True,
@@ -440,7 +673,7 @@ def get_combined_chart_data():
         })
 
     except Exception as e:
-        logger.error(f"Combined chart data failed: {e}")
+        logger.error("Combined chart data failed: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -456,6 +689,7 @@ def test_endpoint():
     """
     Test endpoint to verify all components are working
     """
+    snapshot = get_cache_snapshot()
     return jsonify({
         'status': 'API is working!',
         'timestamp': datetime.now().isoformat(),
@@ -466,8 +700,8 @@ def test_endpoint():
             'correlation_analyzer_ready': correlation_analyzer is not None
         },
         'cache_status': {
-            'has_sentiment_data': len(cache['headlines_data']) > 0,
-            'last_update': cache['last_update']
+            'has_sentiment_data': len(snapshot['headlines_data']) > 0,
+            'last_update': snapshot['last_update']
         }
     })
 
@@ -477,8 +711,6 @@ def test_endpoint():
 # ============================================================================
 
 if __name__ == '__main__':
-    import os
-
     # Get configuration from environment variables (production) or use defaults (development)
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_ENV') != 'production'
@@ -495,8 +727,14 @@ if __name__ == '__main__':
     print("\nPress CTRL+C to quit")
     print("=" * 60)
 
+    # No fork ahead when serving directly, so warm up right away
+    if WARMUP_ON_START:
+        warm_up_prices()
+        warm_up_model()
+
     app.run(
         debug=debug_mode,
         host='0.0.0.0',  # Allow external connections
-        port=port
+        port=port,
+        threaded=True  # Serve concurrent requests from one process (shared cache)
     )
\ No newline at end of file
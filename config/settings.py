@@ -4,6 +4,7 @@ Description:
 Created by: Renesh Ravi
 '''
 
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -26,6 +27,10 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 REQUEST_DELAY = 1
 TIMEOUT = 10
 MAX_RETRIES = 3
+RETRY_BACKOFF = 2  # Seconds before the first retry, doubled for each retry after
+CONCURRENT_REQUESTS = 6
+MAX_PAGES_PER_SOURCE = 20  # Upper bound on paginated pages fetched per section
+PAGE_CACHE_SIZE = 64  # Scraped pages kept for conditional re-fetching
 
 NEWS_SOURCES = {
     "coindesk": {
@@ -33,4 +38,35 @@ NEWS_SOURCES = {
         "bitcoin_section": "/tag/bitcoin/",
         "enabled": True
     }
-}
\ No newline at end of file
+}
+
+# Sentiment analysis
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+# Quantize finBERT to int8 for faster CPU inference
+SENTIMENT_QUANTIZE = os.getenv("SENTIMENT_QUANTIZE", "false").lower() == "true"
+# Compile finBERT with torch.compile at load time
+SENTIMENT_COMPILE = os.getenv("SENTIMENT_COMPILE", "false").lower() == "true"
+# CPU threads for inference (0 = torch default, one per core)
+SENTIMENT_NUM_THREADS = int(os.getenv("SENTIMENT_NUM_THREADS", "0"))
+# Run finBERT in half precision (bfloat16 or float16) when a GPU is available
+SENTIMENT_FP16 = os.getenv("SENTIMENT_FP16", "false").lower() == "true"
+# Run inference through ONNX Runtime (requires onnxruntime, or onnxruntime-gpu)
+SENTIMENT_ONNX = os.getenv("SENTIMENT_ONNX", "false").lower() == "true"
+# Recently scored headlines kept to skip repeat inference (0 = no cache)
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "10000"))
+# Seconds the batching worker waits to coalesce concurrent requests
+SENTIMENT_MAX_LATENCY = float(os.getenv("SENTIMENT_MAX_LATENCY", "0.1"))
+
+# Seconds to reuse CoinGecko historical prices (daily data changes once a day)
+PRICE_CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "3600"))
+
+# Seconds to reuse a completed analysis for identical request parameters
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", "900"))
+
+# Prefetch prices and load finBERT as soon as the serving process starts,
+# instead of on first request. Under gunicorn both happen in each worker
+# after the fork (gunicorn.conf.py), so the master never opens CoinGecko
+# connections or touches CUDA or torch's thread pools.
+# Weights are therefore not shared between workers: each one holds its own
+# copy. Off by default.
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "false").lower() == "true"
@@ -0,0 +1,32 @@
+"""
+File: gunicorn.conf.py
+Description: gunicorn server hooks. Command-line settings stay in the
+Procfile.
+Created by: Renesh Ravi
+"""
+
+import os
+
+# The Procfile doesn't preload the app, so CoinGecko connections and finBERT
+# only ever start in a worker. With one worker there is no memory to share
+# copy-on-write, and the model can't be loaded before the fork anyway. If
+# --preload is added back, this file still runs in the master before the
+# app is imported, so the app can tell it is in the master (workers inherit
+# the variable but not the pid) and refuse to load finBERT there.
+# on_starting would be too late: it fires after the preload.
+os.environ['GUNICORN_MASTER_PID'] = str(os.getpid())
+
+
+def post_fork(server, worker):
+    """
+    Prefetch prices and start loading finBERT in a freshly forked worker
+    when WARMUP_ON_START is set. Neither may happen in the master: pooled
+    HTTP connections would be shared with the workers, and CUDA and torch's
+    thread pools don't survive the fork.
+    """
+    from config.settings import WARMUP_ON_START
+
+    if WARMUP_ON_START:
+        from app import warm_up_model, warm_up_prices
+        warm_up_prices()
+        warm_up_model()
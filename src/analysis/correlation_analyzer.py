@@ -7,16 +7,21 @@ movements to identify predictive relationships.
 Created by: Renesh Ravi
 """
 
+import bisect
 import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict
-from scipy import stats
+from typing import List, Dict, Tuple
+from scipy import special
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Lower bounds of |r| for each correlation strength after the first
+_STRENGTH_BINS = (0.2, 0.4, 0.7)
+_STRENGTH_NAMES = ("very weak", "weak", "moderate", "strong")
+
 
 @dataclass
 class CorrelationResult:
@@ -57,6 +62,16 @@ class CorrelationAnalyzer:
                                    Default 0.05 = 95% confidence level
         """
         self.significance_threshold = significance_threshold
+        
+        # (sentiment_data, length, prepared DataFrame) from the last call to
+        # _prepare_sentiment_dataframe. The three analyses are normally run
+        # back to back on the same list, so it is only prepared once. Holding
+        # the list itself keeps the identity check valid.
+        self._last_prepared = None
+        
+        # Same idea for the merged sentiment/price frames: (sentiment_data,
+        # price_data, their lengths, frames) from _prepare_merged_dataframe
+        self._last_merged = None
         logger.info(f"CorrelationAnalyzer initialized (p-value threshold: {significance_threshold})")
     
     def calculate_daily_correlation(self, sentiment_data: List[Dict], 
@@ -83,27 +98,23 @@ class CorrelationAnalyzer:
         
         logger.info("Calculating daily sentiment-price correlation")
         
-        # Prepare sentiment data (convert to daily averages)
-        sentiment_df = self._prepare_sentiment_dataframe(sentiment_data)
-        
-        # Prepare price data
-        price_df = pd.DataFrame(price_data)
+        # Daily sentiment averages, prices, and the two merged on matching
+        # dates (inner join = only days with both sentiment and price)
+        sentiment_df, price_df, merged_df = self._prepare_merged_dataframe(
+            sentiment_data, price_data)
         
         # Check if we have enough data
         if sentiment_df.empty or price_df.empty:
             logger.warning("Insufficient data for correlation analysis")
             return self._empty_result("Insufficient data provided")
         
-        # Merge on matching dates (inner join = only days with both sentiment and price)
-        merged_df = pd.merge(sentiment_df, price_df, on='date', how='inner')
-        
         if len(merged_df) < 3:
             logger.warning(f"Only {len(merged_df)} overlapping days - need at least 3")
             return self._empty_result(f"Only {len(merged_df)} overlapping days found")
         
         # Calculate Pearson correlation
-        # scipy.stats.pearsonr returns (correlation_coefficient, p_value)
-        correlation_coef, p_value = stats.pearsonr(
+        # _pearson returns (correlation_coefficient, p_value)
+        correlation_coef, p_value = self._pearson(
             merged_df['daily_avg_sentiment'],  # X variable: sentiment
             merged_df['price']                  # Y variable: price
         )
@@ -146,27 +157,20 @@ class CorrelationAnalyzer:
         
         logger.info("Calculating sentiment vs price change correlation")
         
-        sentiment_df = self._prepare_sentiment_dataframe(sentiment_data)
-        price_df = pd.DataFrame(price_data)
+        _, price_df, merged_df = self._prepare_merged_dataframe(
+            sentiment_data, price_data)
         
         if len(price_df) < 2:
             return self._empty_result("Need at least 2 days of price data")
         
-        # Sort by date and calculate daily price changes
-        price_df = price_df.sort_values('date')
-        price_df['price_change_pct'] = price_df['price'].pct_change() * 100
-        
-        # Remove first row (has NaN for price change)
-        price_df = price_df.dropna()
-        
-        # Merge with sentiment data
-        merged_df = pd.merge(sentiment_df, price_df, on='date', how='inner')
+        # Remove the first price day (has NaN for price change)
+        merged_df = merged_df[merged_df['price_change_pct'].notna()]
         
         if len(merged_df) < 3:
             return self._empty_result(f"Only {len(merged_df)} overlapping days")
         
         # Calculate correlation
-        correlation_coef, p_value = stats.pearsonr(
+        correlation_coef, p_value = self._pearson(
             merged_df['daily_avg_sentiment'],
             merged_df['price_change_pct']
         )
@@ -212,28 +216,30 @@ class CorrelationAnalyzer:
         
         logger.info(f"Analyzing sentiment as {lag_days}-day leading indicator")
         
-        sentiment_df = self._prepare_sentiment_dataframe(sentiment_data)
-        price_df = pd.DataFrame(price_data).sort_values('date')
+        _, price_df, merged_df = self._prepare_merged_dataframe(
+            sentiment_data, price_data)
         
         if len(price_df) < lag_days + 2:
             return {'error': 'Insufficient data for leading indicator analysis'}
         
         # Calculate future price changes
-        # shift(-lag_days) moves values up, comparing today with N days later
-        price_df['future_price'] = price_df['price'].shift(-lag_days)
-        price_df['future_change_pct'] = (
-            (price_df['future_price'] - price_df['price']) / price_df['price'] * 100
+        # Each merged day looks up the price lag_days rows later in the sorted
+        # price series; days without one that far ahead are dropped
+        prices = price_df['price'].to_numpy()
+        future_position = merged_df['price_position'].to_numpy(dtype=np.int64) + lag_days
+        has_future = future_position < len(prices)
+        
+        merged_df = merged_df[has_future].assign(
+            future_price=prices[future_position[has_future]])
+        merged_df['future_change_pct'] = (
+            (merged_df['future_price'] - merged_df['price']) / merged_df['price'] * 100
         )
         
-        # Merge with sentiment
-        merged_df = pd.merge(sentiment_df, price_df, on='date', how='inner')
-        merged_df = merged_df.dropna()
-        
         if len(merged_df) < 3:
             return {'error': f'Only {len(merged_df)} data points available'}
         
         # Calculate correlation between today's sentiment and future price change
-        correlation_coef, p_value = stats.pearsonr(
+        correlation_coef, p_value = self._pearson(
             merged_df['daily_avg_sentiment'],
             merged_df['future_change_pct']
         )
@@ -243,16 +249,12 @@ class CorrelationAnalyzer:
         # Calculate prediction accuracy
         # If sentiment > 0.1 (bullish) and price goes up, that's correct
         # If sentiment < -0.1 (bearish) and price goes down, that's correct
-        predictions_correct = 0
-        total_predictions = len(merged_df)
+        sentiment_bullish = merged_df['daily_avg_sentiment'].to_numpy() > 0.1
+        price_increased = merged_df['future_change_pct'].to_numpy() > 0
         
-        for _, row in merged_df.iterrows():
-            sentiment_bullish = row['daily_avg_sentiment'] > 0.1
-            price_increased = row['future_change_pct'] > 0
-            
-            # Correct prediction if both agree
-            if (sentiment_bullish and price_increased) or (not sentiment_bullish and not price_increased):
-                predictions_correct += 1
+        # Correct prediction if both agree
+        predictions_correct = int((sentiment_bullish == price_increased).sum())
+        total_predictions = len(merged_df)
         
         prediction_accuracy = (predictions_correct / total_predictions) * 100 if total_predictions > 0 else 0
         
@@ -273,6 +275,98 @@ class CorrelationAnalyzer:
             )
         }
     
+    def _pearson(self, x, y) -> Tuple[float, float]:
+        """
+        Pearson correlation coefficient and two-sided p-value
+        
+        Computes r as the dot product of the centered series divided by their
+        norms, and the p-value from the equivalent t statistic
+        t = r * sqrt((n - 2) / (1 - r^2)) with n - 2 degrees of freedom. The
+        t CDF is evaluated with the scipy.special.stdtr ufunc directly rather
+        than through the scipy.stats distribution machinery. This gives the
+        same result as scipy.stats.pearsonr with less overhead.
+        
+        Args:
+            x: First series of values
+            y: Second series of values (same length as x, at least 3)
+        
+        Returns:
+            Tuple of (correlation_coefficient, p_value); both NaN if either
+            series is constant
+        """
+        
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n = x.size
+        
+        x_centered = x - x.mean()
+        y_centered = y - y.mean()
+        denominator = np.linalg.norm(x_centered) * np.linalg.norm(y_centered)
+        
+        if denominator == 0:
+            return float('nan'), float('nan')
+        
+        # Clip guards against rounding pushing |r| slightly past 1
+        r = float(np.clip(x_centered @ y_centered / denominator, -1.0, 1.0))
+        
+        if abs(r) == 1.0:
+            return r, 0.0
+        
+        t_stat = r * np.sqrt((n - 2) / (1 - r * r))
+        p_value = float(2 * special.stdtr(n - 2, -abs(t_stat)))
+        
+        return r, p_value
+    
+    def _prepare_merged_dataframe(self, sentiment_data: List[Dict],
+                                  price_data: List[Dict]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Build the daily sentiment, price and merged DataFrames shared by the
+        three analyses
+        
+        Prices are sorted by date once (if not already) and get their daily change and their
+        row position in the sorted series (used to look up future prices),
+        then are joined with daily sentiment in a single merge. The result for
+        the most recent pair of lists is reused if the same lists are passed
+        again, so callers must not modify the returned DataFrames.
+        
+        Returns:
+            Tuple of (sentiment_df, price_df, merged_df)
+        """
+        
+        last_merged = self._last_merged
+        if (last_merged is not None and last_merged[0] is sentiment_data
+                and last_merged[1] is price_data
+                and last_merged[2] == (len(sentiment_data), len(price_data))):
+            return last_merged[3]
+        
+        sentiment_df = self._prepare_sentiment_dataframe(sentiment_data)
+        price_df = pd.DataFrame(price_data)
+        
+        if not price_df.empty:
+            price_df['date'] = pd.to_datetime(price_df['date'], format='%Y-%m-%d',
+                                              errors='coerce')
+            
+            # CoinGecko already returns prices oldest first
+            if not price_df['date'].is_monotonic_increasing:
+                price_df = price_df.sort_values('date', kind='stable')
+            
+            prices = price_df['price'].to_numpy(dtype=np.float64)
+            price_df['price_change_pct'] = np.concatenate(
+                ([np.nan], np.diff(prices) / prices[:-1] * 100))
+            price_df['price_position'] = np.arange(len(price_df))
+        
+        if sentiment_df.empty or price_df.empty:
+            merged_df = pd.DataFrame(columns=['date', 'daily_avg_sentiment', 'price',
+                                              'price_change_pct', 'price_position'])
+        else:
+            merged_df = pd.merge(sentiment_df, price_df, on='date', how='inner')
+        
+        frames = (sentiment_df, price_df, merged_df)
+        self._last_merged = (sentiment_data, price_data,
+                             (len(sentiment_data), len(price_data)), frames)
+        
+        return frames
+    
     def _prepare_sentiment_dataframe(self, sentiment_data: List[Dict]) -> pd.DataFrame:
         """
         Convert raw sentiment data to DataFrame with daily averages
@@ -280,47 +374,60 @@ class CorrelationAnalyzer:
         Multiple headlines per day are averaged into a single daily sentiment score.
         This is necessary because we have many headlines per day but only one
         price point per day.
+        
+        The result for the most recent list is reused if the same list is
+        passed again, so callers must not modify the returned DataFrame.
         """
         
         if not sentiment_data:
             return pd.DataFrame()
         
-        records = []
-        
-        for item in sentiment_data:
-            if isinstance(item, dict):
-                # Extract date
-                date_str = item.get('published_at', '')
-                
-                if isinstance(date_str, str):
-                    # Handle ISO format timestamps
-                    if 'T' in date_str:
-                        date_obj = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    else:
-                        try:
-                            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                        except:
-                            continue
-                else:
-                    date_obj = date_str
-                
-                records.append({
-                    'date': date_obj.strftime('%Y-%m-%d'),
-                    'sentiment_score': item.get('sentiment_score', 0)
-                })
-        
-        df = pd.DataFrame(records)
+        last_prepared = self._last_prepared
+        if (last_prepared is not None and last_prepared[0] is sentiment_data
+                and last_prepared[1] == len(sentiment_data)):
+            return last_prepared[2]
+        
+        daily_sentiment = self._build_sentiment_dataframe(sentiment_data)
+        self._last_prepared = (sentiment_data, len(sentiment_data), daily_sentiment)
+        
+        return daily_sentiment
+    
+    def _build_sentiment_dataframe(self, sentiment_data: List[Dict]) -> pd.DataFrame:
+        """
+        Build the daily averages DataFrame for _prepare_sentiment_dataframe
+        """
+        
+        df = pd.DataFrame(
+            [item for item in sentiment_data if isinstance(item, dict)],
+            columns=['published_at', 'sentiment_score']
+        )
+        
+        # Calendar date as written: ISO strings, plain 'YYYY-MM-DD' strings
+        # and datetime objects all start with the date. Anything that doesn't
+        # is dropped. Dates are kept as datetime64 so the groupby and the
+        # merge with prices hash integers rather than strings.
+        dates = pd.to_datetime(df['published_at'].astype(str).str[:10],
+                               format='%Y-%m-%d', errors='coerce')
+        valid = dates.notna()
+        
+        df = pd.DataFrame({
+            'date': dates[valid],
+            'sentiment_score': df.loc[valid, 'sentiment_score'].fillna(0)
+        })
         
         if df.empty:
             return df
         
-        # Group by date and calculate daily average sentiment
-        daily_sentiment = df.groupby('date')['sentiment_score'].agg([
-            ('daily_avg_sentiment', 'mean'),
-            ('headline_count', 'count')
-        ]).reset_index()
+        # Group by date and calculate daily average sentiment. Scores were
+        # filled above, so size() equals the non-null count. Day order doesn't
+        # matter here (the merge and the correlations don't depend on it).
+        daily_groups = df.groupby('date', sort=False)['sentiment_score']
+        daily_sentiment = pd.DataFrame({
+            'daily_avg_sentiment': daily_groups.mean(),
+            'headline_count': daily_groups.size()
+        }).reset_index()
         
-        logger.debug(f"Prepared {len(daily_sentiment)} unique days from {len(records)} headlines")
+        logger.debug(f"Prepared {len(daily_sentiment)} unique days from {len(df)} headlines")
         
         return daily_sentiment
     
@@ -336,16 +443,12 @@ class CorrelationAnalyzer:
             analysis_type: "daily_prices" or "price_changes"
         """
         
-        # Classify strength
+        # Classify strength (NaN, from a constant series, counts as very weak)
         abs_corr = abs(correlation)
-        if abs_corr >= 0.7:
-            strength = "strong"
-        elif abs_corr >= 0.4:
-            strength = "moderate"
-        elif abs_corr >= 0.2:
-            strength = "weak"
+        if np.isnan(abs_corr):
+            strength = _STRENGTH_NAMES[0]
         else:
-            strength = "very weak"
+            strength = _STRENGTH_NAMES[bisect.bisect_right(_STRENGTH_BINS, abs_corr)]
         
         direction = "positive" if correlation > 0 else "negative"
         
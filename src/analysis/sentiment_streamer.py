@@ -0,0 +1,153 @@
+"""
+File: sentiment_streamer.py
+Description: Micro-batching front end that coalesces concurrent sentiment
+requests into shared finBERT forward passes
+Created by: Renesh Ravi
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import List, Dict, Union, Optional
+
+from .sentiment_analyzer import SentimentAnalyzer, SentimentResult
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting caller checks that the worker thread is still alive
+_WORKER_CHECK_INTERVAL = 1.0
+
+
+class _PendingRequest:
+    """Texts submitted by one caller, filled in as batches complete."""
+
+    def __init__(self, size: int):
+        self.results: List[Optional[SentimentResult]] = [None] * size
+        self.remaining = size
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        if size == 0:
+            self.done.set()
+
+
+class SentimentStreamer:
+    """
+    Collects texts from concurrent callers on a queue and scores them
+    together. A single background worker waits up to `max_latency` seconds
+    to fill a batch of `batch_size` texts, runs one forward pass, then hands
+    each caller back its own results.
+    """
+
+    def __init__(self, analyzer: SentimentAnalyzer, batch_size: int = 32,
+                 max_latency: float = 0.1):
+        """
+        Initialize the streamer around an existing analyzer.
+        :param analyzer: The SentimentAnalyzer used to run inference.
+        :param batch_size: Maximum number of texts scored per forward pass.
+        :param max_latency: Longest time in seconds the worker waits for more
+        texts before running a partially filled batch.
+        """
+        self.analyzer = analyzer
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        """
+        Starts the background worker on first use, so the thread is created
+        in the process that serves requests.
+        :return: The running worker thread.
+        """
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="sentiment-streamer", daemon=True)
+                self._worker.start()
+            return self._worker
+
+    def predict(self, texts: List[str]) -> List[SentimentResult]:
+        """
+        Scores texts, possibly sharing forward passes with other callers.
+        :param texts: Headline texts to be analyzed.
+        :return: One SentimentResult per text, in the original order.
+        :raises RuntimeError: If the worker thread dies before the texts are
+        scored.
+        """
+        worker = self._ensure_worker()
+
+        request = _PendingRequest(len(texts))
+        for index, text in enumerate(texts):
+            self._queue.put((request, index, text))
+
+        # Don't block forever if the worker dies outside its per-batch
+        # error handling; the next caller starts a fresh worker
+        while not request.done.wait(timeout=_WORKER_CHECK_INTERVAL):
+            if not worker.is_alive():
+                raise RuntimeError(
+                    "Sentiment worker stopped before scoring the request")
+
+        if request.error is not None:
+            raise request.error
+
+        return request.results
+
+    def analyze_batch(self, headlines: List[Union[str, Dict]]) -> Dict:
+        """
+        Drop-in replacement for SentimentAnalyzer.analyze_batch that routes
+        the headlines through the shared batching queue.
+        :param headlines: Headlines to be analyzed.
+        :return: Dictionary containing the summary results.
+        """
+        texts = self.analyzer._extract_texts(headlines)
+        results = self.predict(texts)
+        return self.analyzer.summarize_results(results, len(headlines))
+
+    def _collect_batch(self) -> List[tuple]:
+        """
+        Blocks for the first queued text, then gathers more until the batch
+        is full or max_latency has elapsed.
+        :return: List of (request, index, text) items.
+        """
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_latency
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """
+        Worker loop: score each collected batch and demultiplex the results
+        back to the callers that submitted them.
+        """
+        while True:
+            batch = self._collect_batch()
+            logger.debug(f"Streamer running batch of {len(batch)} texts")
+
+            try:
+                results = self.analyzer.analyze_texts(
+                    [text for _, _, text in batch],
+                    batch_size=self.batch_size)
+            except Exception as e:
+                logger.error(f"Streamer batch failed: {e}")
+                for request, _, _ in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+
+            for (request, index, _), result in zip(batch, results):
+                request.results[index] = result
+                request.remaining -= 1
+                if request.remaining == 0:
+                    request.done.set()
@@ -4,22 +4,91 @@ Description: Base scraper class for scraping news sources
 Created by: Renesh Ravi
 """
 
+import re
 import time
+import random
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 
 from config.settings import (
-    USER_AGENT, REQUEST_DELAY, TIMEOUT, MAX_RETRIES
+    USER_AGENT, REQUEST_DELAY, TIMEOUT, MAX_RETRIES, RETRY_BACKOFF,
+    CONCURRENT_REQUESTS, PAGE_CACHE_SIZE
 )
+from src.utilities.ttl_cache import TTLCache
 
 
 logger = logging.getLogger(__name__)
 
+
+def _compile_terms(*term_lists: List[str]) -> re.Pattern:
+    """
+    Compile keyword lists into one regex matching any of them as a substring,
+    so a text is scanned once per group instead of once per keyword.
+    :param term_lists: Lowercase keywords to match.
+    :return: Compiled alternation of the escaped keywords.
+    """
+    terms = sorted({term for terms in term_lists for term in terms},
+                   key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, terms)))
+
+
+# Keywords used by BaseScraper._is_bitcoin_related, matched against lowercase
+# text. Any term in these groups marks the text as related on its own.
+_BITCOIN_DIRECT = ['bitcoin', 'btc', 'satoshi', 'sats']
+_CRYPTO_ENTITIES = [
+    'coinbase', 'binance', 'kraken', 'microstrategy', 'grayscale',
+    'blackrock', 'fidelity', 'tesla', 'square', 'paypal',
+    'el salvador', 'bukele', 'saylor'
+]
+_BITCOIN_TECH = [
+    'lightning network', 'taproot', 'segwit', 'hash rate',
+    'halving', 'proof of work', 'block reward', 'difficulty adjustment',
+    'utxo', 'multisig', 'cold storage', 'hardware wallet'
+]
+_DEFI_TERMS = ['defi', 'decentralized finance', 'web3', 'dapp', 'smart contract']
+_CRYPTO_PRODUCTS = [
+    'bitcoin etf', 'crypto etf', 'digital asset fund', 'cryptocurrency fund',
+    'bitcoin futures', 'crypto derivatives', 'bitcoin options'
+]
+_MARKET_TERMS = ['hodl', 'whale', 'pump', 'dump', 'moon', 'diamond hands', 'paper hands']
+
+# These groups only count in combination with another group
+_CRYPTO_GENERAL = ['cryptocurrency', 'crypto', 'digital currency', 'digital asset', 'blockchain']
+_FINANCIAL_CONTEXT = ['price', 'trading', 'investment', 'fund', 'etf', 'exchange', 'market', 'value']
+_MINING_TERMS = ['mining', 'miners', 'hash rate', 'difficulty']
+_MINING_CONTEXT = ['energy', 'power', 'electricity', 'carbon', 'renewable', 'efficiency']
+_REGULATORY_TERMS = ['sec', 'cftc', 'regulation', 'ban', 'legal', 'compliance', 'approve', 'reject']
+
+_ALWAYS_RELATED_RE = _compile_terms(_BITCOIN_DIRECT, _CRYPTO_ENTITIES,
+                                    _BITCOIN_TECH, _DEFI_TERMS,
+                                    _CRYPTO_PRODUCTS, _MARKET_TERMS)
+_CRYPTO_GENERAL_RE = _compile_terms(_CRYPTO_GENERAL)
+_FINANCIAL_CONTEXT_RE = _compile_terms(_FINANCIAL_CONTEXT)
+_MINING_TERMS_RE = _compile_terms(_MINING_TERMS)
+_MINING_CONTEXT_RE = _compile_terms(_MINING_CONTEXT)
+_REGULATORY_RE = _compile_terms(_REGULATORY_TERMS)
+
+# Unicode punctuation replaced with plain ASCII by BaseScraper._clean_text
+_UNICODE_TABLE = str.maketrans({
+    '\u00a0': ' ',  # Non-breaking space
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+})
+
+# Root-relative path that urljoin would pass through unchanged (it drops tabs
+# and newlines and reads a leading '//' as a new host)
+_ROOT_RELATIVE_PATH_RE = re.compile(r'/(?!/)[^\t\n\r]*')
+
+
 class BaseScraper(ABC):
     """
     Base class for all news scrapers
@@ -33,48 +102,132 @@ class BaseScraper(ABC):
         """
         self.base_url = base_url
         self.source_name = source_name
+        # Root-relative links resolve against scheme://host alone
+        parsed_base = urlparse(base_url)
+        self._base_origin = f"{parsed_base.scheme}://{parsed_base.netloc}"
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': USER_AGENT,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            # Every encoding urllib3 can decode here, including brotli
+            # (smaller HTML than gzip) when the brotli package is installed
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
         })
 
-    def _make_request(self, url: str, retries: int = 0) -> Optional[
-        requests.Response]:
+        # Keep one warm connection per concurrent worker so parallel page
+        # fetches reuse TLS sessions instead of reconnecting. Retries stay in
+        # _make_request, so the adapter itself does not retry.
+        adapter = HTTPAdapter(pool_maxsize=CONCURRENT_REQUESTS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Last response per URL that carried an ETag or Last-Modified
+        # validator, so repeat fetches can be conditional and an unchanged
+        # page costs a 304 instead of a full download. Freshness is decided
+        # by the server, the TTL only bounds how long pages are held.
+        self._page_cache = TTLCache(maxsize=PAGE_CACHE_SIZE, ttl=24 * 3600)
+
+    def _make_request(self, url: str) -> Optional[requests.Response]:
         """
         Perform an HTTP GET request with retry logic and a built-in rate limiter.
+        Failed requests are retried up to MAX_RETRIES times with exponential
+        backoff and jitter; client errors other than 429 are not retried.
         :param url: The target URL to request.
-        :param retries: Current retry count (used internally for
-        recursion). Defaults to 0.
         :return: A valid Response object if successful or None if the request ultimately fails.
         """
-        try:
-            time.sleep(REQUEST_DELAY)
-            response = self.session.get(url, timeout=TIMEOUT)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Request failed for {url}: {e}")
-
-            if retries < MAX_RETRIES:
-                wait_time = (retries + 1) * 2
-                logger.info(f"Retrying in {wait_time} seconds")
-                time.sleep(wait_time)
-                return self._make_request(url, retries + 1)
-            else:
-                logger.error(f"Max retries exceeded for {url}")
-                return None
+        cached = self._page_cache.get(url)
+        conditional_headers = self._conditional_headers(cached)
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                # Jitter the politeness delay so concurrent workers don't fire in
+                # lockstep against the same host.
+                time.sleep(REQUEST_DELAY * random.uniform(0.5, 1.5))
+                response = self.session.get(url, timeout=TIMEOUT,
+                                            headers=conditional_headers)
+                if response.status_code == 304 and cached is not None:
+                    logger.debug(f"Not modified, reusing cached page: {url}")
+                    return cached
+
+                response.raise_for_status()
+                if self._conditional_headers(response):
+                    self._page_cache.set(url, response)
+                return response
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Request failed for {url}: {e}")
+
+                # A missing page (e.g. past the last page) won't appear on retry
+                status = getattr(e.response, 'status_code', None)
+                if status is not None and 400 <= status < 500 and status != 429:
+                    return None
+
+                if attempt < MAX_RETRIES:
+                    wait_time = RETRY_BACKOFF * 2 ** attempt + \
+                        random.uniform(0, RETRY_BACKOFF)
+                    logger.info(f"Retrying in {wait_time:.1f} seconds")
+                    time.sleep(wait_time)
+
+        logger.error(f"Max retries exceeded for {url}")
+        return None
+
+    def _conditional_headers(self, response: Optional[requests.Response]) -> \
+            Dict[str, str]:
+        """
+        Build the conditional GET headers for revalidating a cached page.
+        :param response: The previously fetched response, if any.
+        :return: If-None-Match/If-Modified-Since headers for its validators,
+        empty if it has none.
+        """
+        if response is None:
+            return {}
+
+        headers = {}
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def _make_concurrent_requests(self, urls: List[str],
+                                  fetch: Optional[Callable[[str], Any]] = None
+                                  ) -> Dict[str, Any]:
+        """
+        Perform several HTTP GET requests in parallel, at most
+        CONCURRENT_REQUESTS at a time, each with the usual retry logic.
+        :param urls: The target URLs to request.
+        :param fetch: Optional per-URL work to run in the worker instead of a
+        plain '_make_request', e.g. fetching and parsing a page so parsing
+        overlaps the other downloads.
+        :return: Dictionary mapping every URL to its Response (or the result
+        of 'fetch'), or None if the request ultimately failed.
+        """
+        responses = {}
+        fetch = fetch or self._make_request
+
+        with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as executor:
+            futures = {url: executor.submit(fetch, url)
+                       for url in dict.fromkeys(urls)}
+
+            for url, future in futures.items():
+                try:
+                    responses[url] = future.result()
+                except Exception as e:
+                    logger.error(f"Request failed for {url}: {e}")
+                    responses[url] = None
+
+        return responses
 
     def _parse_html(self, html_content: str) -> BeautifulSoup:
         """
         Parse raw HTML content into a BeautifulSoup object.
         :param html_content: The raw HTML content as a string.
-        :return: A BeautifulSoup object parsed with the 'html.parser'
+        :return: A BeautifulSoup object parsed with the C-based 'lxml' parser.
         """
-        return BeautifulSoup(html_content, 'html.parser')
+        return BeautifulSoup(html_content, 'lxml')
 
     def _clean_text(self, text: str) -> str:
         """
@@ -86,14 +239,9 @@ class BaseScraper(ABC):
         if not text:
             return ""
 
-        cleaned = ' '.join(text.split())
-
-        cleaned = cleaned.replace('\u00a0', ' ')
-        cleaned = cleaned.replace('\u2019', "'")
-        cleaned = cleaned.replace('\u201c', '"')
-        cleaned = cleaned.replace('\u201d', '"')
-
-        return cleaned.strip()
+        # One translate pass for the substitutions; split/join then collapses
+        # all whitespace and trims the ends
+        return ' '.join(text.translate(_UNICODE_TABLE).split())
 
     def _build_absolute_url(self, relative_url: str) -> str:
         """
@@ -102,6 +250,11 @@ class BaseScraper(ABC):
                             extracted from the HTML.
         :return: Absolute URL that combines the scraper's base URL with the provided relative path.
         """
+        # Most scraped links are plain root-relative paths, which need no
+        # full urljoin; dot segments and '//host' links still go through it.
+        if (_ROOT_RELATIVE_PATH_RE.fullmatch(relative_url)
+                and '/.' not in relative_url):
+            return self._base_origin + relative_url
         return urljoin(self.base_url, relative_url)
 
     def _is_bitcoin_related(self, text: str) -> bool:
@@ -115,61 +268,18 @@ class BaseScraper(ABC):
 
         text_lower = text.lower()
 
-        bitcoin_direct = ['bitcoin', 'btc', 'satoshi', 'sats']
-        if any(term in text_lower for term in bitcoin_direct):
+        if _ALWAYS_RELATED_RE.search(text_lower):
             return True
 
-        crypto_entities = [
-            'coinbase', 'binance', 'kraken', 'microstrategy', 'grayscale',
-            'blackrock', 'fidelity', 'tesla', 'square', 'paypal',
-            'el salvador', 'bukele', 'saylor'
-        ]
-        if any(entity in text_lower for entity in crypto_entities):
-            return True
+        has_crypto = _CRYPTO_GENERAL_RE.search(text_lower) is not None
+        has_financial = _FINANCIAL_CONTEXT_RE.search(text_lower) is not None
 
-        crypto_general = ['cryptocurrency', 'crypto', 'digital currency', 'digital asset', 'blockchain']
-        financial_context = ['price', 'trading', 'investment', 'fund', 'etf', 'exchange', 'market', 'value']
-
-        has_crypto = any(term in text_lower for term in crypto_general)
-        has_financial = any(term in text_lower for term in financial_context)
-
-        if has_crypto and has_financial:
-            return True
-
-        bitcoin_tech = [
-            'lightning network', 'taproot', 'segwit', 'hash rate',
-            'halving', 'proof of work', 'block reward', 'difficulty adjustment',
-            'utxo', 'multisig', 'cold storage', 'hardware wallet'
-        ]
-        if any(term in text_lower for term in bitcoin_tech):
-            return True
-
-        mining_terms = ['mining', 'miners', 'hash rate', 'difficulty']
-        mining_context = ['energy', 'power', 'electricity', 'carbon', 'renewable', 'efficiency']
-
-        has_mining = any(term in text_lower for term in mining_terms)
-        has_mining_context = any(term in text_lower for term in mining_context)
-
-        if has_mining and (has_mining_context or has_financial):
+        if has_crypto and (has_financial or
+                           _REGULATORY_RE.search(text_lower)):
             return True
 
-        regulatory_terms = ['sec', 'cftc', 'regulation', 'ban', 'legal', 'compliance', 'approve', 'reject']
-        if has_crypto and any(term in text_lower for term in regulatory_terms):
-            return True
-
-        defi_terms = ['defi', 'decentralized finance', 'web3', 'dapp', 'smart contract']
-        if any(term in text_lower for term in defi_terms):
-            return True
-
-        crypto_products = [
-            'bitcoin etf', 'crypto etf', 'digital asset fund', 'cryptocurrency fund',
-            'bitcoin futures', 'crypto derivatives', 'bitcoin options'
-        ]
-        if any(product in text_lower for product in crypto_products):
-            return True
-
-        market_terms = ['hodl', 'whale', 'pump', 'dump', 'moon', 'diamond hands', 'paper hands']
-        if any(term in text_lower for term in market_terms):
+        if _MINING_TERMS_RE.search(text_lower) and (
+                has_financial or _MINING_CONTEXT_RE.search(text_lower)):
             return True
 
         return False
@@ -210,16 +320,17 @@ class BaseScraper(ABC):
         bitcoin_count = sum(1 for headline in headlines if
                             self._is_bitcoin_related(headline.get('title', '')))
 
+        now = datetime.now()
+        publish_dates = [headline.get('published_at', now)
+                         for headline in headlines]
+
         return {
             "total": len(headlines),
             "bitcoim_related": bitcoin_count,
             "source": self.source_name,
             "date_range" : {
-                "earliest": min(headline.get('published_at', datetime.now(
-
-                )) for headline in headlines),
-                "latest": max(headline.get('published_at', datetime.now())
-                              for headline in headlines)
+                "earliest": min(publish_dates),
+                "latest": max(publish_dates)
             }
         }
 
@@ -5,16 +5,39 @@ Bitcoin news
 Created by: Renesh Ravi
 """
 
+import heapq
 import logging
+import operator
 import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 
+from config.settings import CONCURRENT_REQUESTS, MAX_PAGES_PER_SOURCE
 from .base_scraper import BaseScraper
 
 logger = logging.getLogger(__name__)
 
+# Compiled once and shared, since they run for every link on every page.
+# Links that look like news articles:
+_NEWS_URL_RE = re.compile(
+    r'/\d{4}/\d{2}/\d{2}/'  # Date-based URLs (most reliable)
+    r'|/markets/|/policy/|/tech/|/business/|/news/'
+)
+_URL_DATE_RE = re.compile(r'/(\d{4})/(\d{2})/(\d{2})/')
+# Pattern for: "Aug 25, 2025, 9:00 a.m."
+_COINDESK_TIMESTAMP_RE = re.compile(
+    r'[A-Za-z]{3}\s+\d{1,2},\s+\d{4},\s+\d{1,2}:\d{2}\s+[ap]\.m\.')
+# The same timestamp as a whole string, split into its fields so the common
+# case can be built directly instead of going through strptime.
+_COINDESK_TIMESTAMP_PARTS_RE = re.compile(
+    r'([A-Za-z]{3})\s+(\d{1,2}),\s+(\d{4}),\s+(\d{1,2}):(\d{2})\s+([ap])\.m\.',
+    re.ASCII)
+_MONTHS = {name: number for number, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+     'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1)}
+
+
 class CoindeskScraper(BaseScraper):
     """Headline scraper for CoinDesk Bitcoin news"""
 
@@ -61,90 +84,130 @@ class CoindeskScraper(BaseScraper):
         ]
 
     def get_bitcoin_headlines(self, days_back: int = 7,
-                              max_pages_per_source: int = 3) -> List[Dict]:
+                              max_pages_per_source: int = 3,
+                              limit: Optional[int] = None) -> List[Dict]:
         """
         Scrapes Bitcoin headlines from multiple CoinDesk sections.
         :param days_back: Only include articles published within the last
         'days_back' days. Defaults to 7.
         :param max_pages_per_source: Maximum paginated pages to fetch per
-        section URL. Defaults to 3.
-        :return:
+        section URL, capped at MAX_PAGES_PER_SOURCE. Defaults to 3.
+        :param limit: Maximum number of headlines to return, newest first.
+        None returns all of them.
+        :return: Bitcoin related headlines, newest first, with articles
+        listed in several sections included once.
         """
         logger.info(f"Scraping Bitcoin headlines from {self.source_name}")
-        headlines = []
-
-        for config in self.source_configs:
-            base_url = config['url']
-            supports_pagination = config['supports_pagination']
-            description = config['description']
-
-            logger.info(f"Processing {description}: {base_url}")
-
-            if supports_pagination:
-                logger.info(f"  Using pagination: up to {max_pages_per_source} pages")
-
-                for page_num in range(1, max_pages_per_source + 1):
-                    page_url = self._build_paginated_url(base_url, page_num)
-                    logger.info(f"    Trying page {page_num}: {page_url}")
+        max_pages_per_source = min(max_pages_per_source, MAX_PAGES_PER_SOURCE)
 
-                    try:
-                        response = self._make_request(page_url)
-                        if not response:
-                            logger.info(f"      Page {page_num}: No response - stopping pagination")
-                            break
+        # Next page to fetch and headlines found so far, per section still
+        # being paginated
+        next_page = {config['url']: 1 for config in self.source_configs}
+        source_headlines = {config['url']: [] for config in self.source_configs}
+        configs = {config['url']: config for config in self.source_configs}
 
-                        soup = self._parse_html(response.content)
-                        page_headlines = self._parse_article_list(soup)
-
-                        if page_headlines:
-                            logger.info(f"      Page {page_num}: Found {len(page_headlines)} headlines")
-                            headlines.extend(page_headlines)
-                        else:
-                            logger.info(f"      Page {page_num}: No headlines - end of pages")
-                            break
+        for config in self.source_configs:
+            if config['supports_pagination']:
+                logger.info(f"Processing {config['description']}: up to "
+                            f"{max_pages_per_source} pages")
+            else:
+                logger.info(f"Processing {config['description']}: single page")
+
+        # Fetch in waves of about CONCURRENT_REQUESTS pages, shared between
+        # the sections still paginating, so a section stops costing
+        # requests soon after its last page instead of always getting
+        # max_pages_per_source of them
+        while next_page:
+            share = max(1, CONCURRENT_REQUESTS // len(next_page))
+            wave = {}
+            for base_url, first_page in next_page.items():
+                num_pages = (max_pages_per_source
+                             if configs[base_url]['supports_pagination'] else 1)
+                last_page = min(first_page + share - 1, num_pages)
+                wave[base_url] = [
+                    self._build_paginated_url(base_url, page_num)
+                    for page_num in range(first_page, last_page + 1)
+                ]
+
+            # Each worker parses its page as soon as it arrives, so parsing
+            # overlaps the downloads still in flight
+            page_results = self._make_concurrent_requests(
+                [url for urls in wave.values() for url in urls],
+                fetch=self._fetch_page_headlines)
+
+            for base_url, page_urls in wave.items():
+                description = configs[base_url]['description']
+                page_num = next_page.pop(base_url)
+                for page_url in page_urls:
+                    page_headlines = page_results.get(page_url)
+                    if page_headlines is None:
+                        logger.info(f"      {description} page {page_num}: No response - stopping pagination")
+                        break
 
-                    except Exception as e:
-                        logger.error(f"      Page {page_num}: Error - {e}")
+                    if not page_headlines:
+                        logger.info(f"      {description} page {page_num}: No headlines - end of pages")
                         break
 
+                    logger.info(f"      {description} page {page_num}: Found {len(page_headlines)} headlines")
+                    source_headlines[base_url].extend(page_headlines)
+                    page_num += 1
+                else:
+                    if (configs[base_url]['supports_pagination']
+                            and page_num <= max_pages_per_source):
+                        next_page[base_url] = page_num
 
-            else:
-                # Single page for sources that don't support pagination
-                logger.info(f"  Single page source")
-                try:
-                    response = self._make_request(base_url)
-                    if response:
-                        soup = self._parse_html(response.content)
-                        page_headlines = self._parse_article_list(soup)
-                        if page_headlines:
-                            logger.info(f"    Found {len(page_headlines)} headlines")
-                            headlines.extend(page_headlines)
-                except Exception as e:
-                    logger.error(f"    Error: {e}")
+        headlines = [headline for page_headlines in source_headlines.values()
+                     for headline in page_headlines]
 
         if not headlines:
             logger.warning("No headlines found from any URL")
             return []
 
-        cutoff_date = datetime.now() - timedelta(days=days_back)
+        # Headlines without a date count as published now
+        now = datetime.now()
+        cutoff_date = now - timedelta(days=days_back)
         bitcoin_headlines = []
+        seen_urls = set()
 
         for headline in headlines:
             try:
+                # The same article is often linked from several sections and
+                # pages; once one copy is kept the rest are skipped before
+                # any filtering work
+                url_key = self._url_key(headline.get('url'))
+                if url_key and url_key in seen_urls:
+                    continue
+
                 title_text = headline.get('title', '')
                 summary_text = headline.get('summary', '')
-                combined_text = f"{title_text} {summary_text}"
 
-                if self._is_bitcoin_related(combined_text):
-                    pub_date = headline.get('published_at', datetime.now())
+                # The strategies already classified the title; only a
+                # summary adds text that still needs checking
+                if summary_text or 'bitcoin_related' not in headline:
+                    is_related = self._is_bitcoin_related(
+                        f"{title_text} {summary_text}")
+                else:
+                    is_related = headline['bitcoin_related']
+
+                if is_related:
+                    pub_date = headline.get('published_at', now)
                     if pub_date >= cutoff_date:
+                        if url_key:
+                            seen_urls.add(url_key)
                         bitcoin_headlines.append(headline)
             except Exception as e:
                 logger.debug(f"Error filtering headline: {e}")
                 continue
 
         try:
-            bitcoin_headlines.sort(key=lambda x: x.get('published_at', datetime.min), reverse=True)
+            # Every strategy sets published_at, so no .get() fallback needed
+            sort_key = operator.itemgetter('published_at')
+            if limit is not None:
+                # Only the newest `limit` are needed, no full sort
+                bitcoin_headlines = heapq.nlargest(limit, bitcoin_headlines,
+                                                   key=sort_key)
+            else:
+                bitcoin_headlines.sort(key=sort_key, reverse=True)
         except Exception as e:
             logger.debug(f"Error sorting headlines: {e}")
 
@@ -152,6 +215,35 @@ class CoindeskScraper(BaseScraper):
         logger.info(f"Successfully filtered to {len(final_headlines)} Bitcoin headlines")
         return final_headlines
 
+    def _fetch_page_headlines(self, url: str) -> Optional[List[Dict]]:
+        """
+        Fetch one page and extract its headlines.
+        :param url: The page URL to fetch.
+        :return: The page's headline dictionaries (empty if it could not be
+        parsed), or None if the page could not be fetched.
+        """
+        response = self._make_request(url)
+        if not response:
+            return None
+
+        try:
+            soup = self._parse_html(response.content)
+            return self._parse_article_list(soup)
+        except Exception as e:
+            logger.error(f"Error parsing {url}: {e}")
+            return []
+
+    def _url_key(self, url: Optional[str]) -> str:
+        """
+        Normalizes an article URL for duplicate detection, ignoring any
+        fragment and trailing slash.
+        :param url: Absolute article URL, possibly empty.
+        :return: The normalized URL, or an empty string if there is none.
+        """
+        if not url:
+            return ""
+        return url.split('#', 1)[0].rstrip('/')
+
     def _build_paginated_url(self, base_url: str, page_num: int) -> str:
         """
         Constructs a page-specific URL for a given CoinDesk section.
@@ -219,60 +311,62 @@ class CoindeskScraper(BaseScraper):
         :return: Headline dictionaries derived from qualifying links.
         """
         headlines = []
+        # Sibling links share a parent, so each parent's spans are only
+        # scanned for a timestamp once per page.
+        parent_times = {}
+        # One clock read per page, for scraped_at and undated links
+        now = datetime.now()
 
-        # Look for links that look like news articles
-        news_patterns = [
-            r'/\d{4}/\d{2}/\d{2}/',  # Date-based URLs (most reliable)
-            r'/markets/',
-            r'/policy/',
-            r'/tech/',
-            r'/business/',
-            r'/news/'
-        ]
-
-        all_links = soup.find_all('a', href=True)
+        # Let find_all apply the article URL pattern, so unrelated anchors
+        # (nav, footer, social) are never visited below
+        article_links = soup.find_all('a', href=_NEWS_URL_RE)
 
-        for link in all_links:
+        for link in article_links:
             try:
                 href = link.get('href', '')
-                text = self._clean_text(link.get_text())
+                # Cleaning never lengthens text, so short raw text can be
+                # skipped without cleaning it
+                raw_text = link.get_text()
+                if len(raw_text) < 10:
+                    continue
 
+                text = self._clean_text(raw_text)
                 if not text or len(text) < 10:
                     continue
 
-                if any(re.search(pattern, href) for pattern in news_patterns):
-                    pub_date = self._safe_extract_date_from_url(href)
+                pub_date = self._safe_extract_date_from_url(href, now)
 
-                    time_enhanced_date = self._safe_extract_time_from_context(
-                        link, pub_date)
+                time_enhanced_date = self._safe_extract_time_from_context(
+                    link, pub_date, parent_times)
 
-                    headline_data = {
-                        'title': text,
-                        'url': self._build_absolute_url(href),
-                        'summary': '',
-                        'source': self.source_name,
-                        'published_at': time_enhanced_date,
-                        'scraped_at': datetime.now(),
-                        'bitcoin_related': self._is_bitcoin_related(text)
-                    }
+                headline_data = {
+                    'title': text,
+                    'url': self._build_absolute_url(href),
+                    'summary': '',
+                    'source': self.source_name,
+                    'published_at': time_enhanced_date,
+                    'scraped_at': now,
+                    'bitcoin_related': self._is_bitcoin_related(text)
+                }
 
-                    headlines.append(headline_data)
+                headlines.append(headline_data)
             except Exception as e:
                 logger.debug(f"Error processing link: {e}")
                 continue
 
         return headlines
 
-    def _safe_extract_date_from_url(self, url: str) -> datetime:
+    def _safe_extract_date_from_url(self, url: str,
+                                    now: Optional[datetime] = None) -> datetime:
         """
         Extract a publication date from a URL, falling back to current date.
         :param url: URL to inspect.
-        :return: date inferred from the URL or 'datetime.now() if no date
-        is recognizable.
+        :param now: Current time already read by the caller, if any.
+        :return: date inferred from the URL or 'now' (default
+        'datetime.now()') if no date is recognizable.
         """
         try:
-            date_pattern = r'/(\d{4})/(\d{2})/(\d{2})/'
-            match = re.search(date_pattern, url)
+            match = _URL_DATE_RE.search(url)
 
             if match:
                 year, month, day = match.groups()
@@ -281,36 +375,56 @@ class CoindeskScraper(BaseScraper):
             logger.debug(f"Error extracting date from URL {url}: {e}")
 
         # Fallback to current date
-        return datetime.now()
+        return now or datetime.now()
 
     def _safe_extract_time_from_context(self, link_element,
-                                        base_date: datetime) -> datetime:
+                                        base_date: datetime,
+                                        parent_times: Optional[Dict] = None
+                                        ) -> datetime:
         """
         Potentially parse time from nearby context.
         :param link_element: the element associated with the headline.
         :param base_date: A date to which the parsed time component may be added to.
+        :param parent_times: Optional per-page cache of parsed times keyed by
+        parent element id, shared between links of the same page.
         :return: A 'datetime' that includes the parsed time if found,
         otherwise the original 'base_date'
         """
         try:
             parent = link_element.parent
             if parent:
-                time_spans = parent.find_all('span')
-
-                for span in time_spans:
-                    text = span.get_text().strip()
-
-                    if self._looks_like_coindesk_timestamp(text):
-                        parsed_time = self._safe_parse_coindesk_timestamp(
-                            text)
-                        if parsed_time:
-                            return datetime.combine(base_date.date(),
-                                                    parsed_time.time())
+                if parent_times is None:
+                    parsed_time = self._find_timestamp_in(parent)
+                else:
+                    key = id(parent)
+                    if key not in parent_times:
+                        parent_times[key] = self._find_timestamp_in(parent)
+                    parsed_time = parent_times[key]
+
+                if parsed_time:
+                    return datetime.combine(base_date.date(),
+                                            parsed_time.time())
         except Exception as e:
             logger.debug(f"Error extracting time from context: {e}")
 
         return base_date  # Return the base date if time extraction fails
 
+    def _find_timestamp_in(self, element) -> Optional[datetime]:
+        """
+        Find the first CoinDesk timestamp among an element's spans.
+        :param element: The element whose spans are searched.
+        :return: The parsed timestamp, or 'None' if no span holds one.
+        """
+        for span in element.find_all('span'):
+            text = span.get_text().strip()
+
+            if self._looks_like_coindesk_timestamp(text):
+                parsed_time = self._safe_parse_coindesk_timestamp(text)
+                if parsed_time:
+                    return parsed_time
+
+        return None
+
     def _looks_like_coindesk_timestamp(self, text: str) -> bool:
         """
         Checks whether 'text' matches CoinDesk timestamp stype for
@@ -323,9 +437,7 @@ class CoindeskScraper(BaseScraper):
             if not text or len(text.strip()) < 10:
                 return False
 
-            # Pattern for: "Aug 25, 2025, 9:00 a.m."
-            coindesk_pattern = r'[A-Za-z]{3}\s+\d{1,2},\s+\d{4},\s+\d{1,2}:\d{2}\s+[ap]\.m\.'
-            return bool(re.search(coindesk_pattern, text))
+            return bool(_COINDESK_TIMESTAMP_RE.search(text))
         except Exception as e:
             logger.debug(f"Error checking timestamp pattern: {e}")
             return False
@@ -343,6 +455,10 @@ class CoindeskScraper(BaseScraper):
 
             datetime_str = datetime_str.strip()
 
+            parsed = self._fast_parse_coindesk_timestamp(datetime_str)
+            if parsed:
+                return parsed
+
             if 'a.m.' in datetime_str or 'p.m.' in datetime_str:
                 datetime_str = datetime_str.replace('a.m.', 'AM').replace(
                     'p.m.', 'PM')
@@ -362,6 +478,30 @@ class CoindeskScraper(BaseScraper):
 
         return None
 
+    def _fast_parse_coindesk_timestamp(self, datetime_str: str) -> Optional[
+        datetime]:
+        """
+        Build a datetime straight from a full CoinDesk timestamp.
+        :param datetime_str: Stripped timestamp text.
+        :return: The parsed 'datetime', or 'None' if the text is not a valid
+        full timestamp and the strptime path should decide.
+        """
+        match = _COINDESK_TIMESTAMP_PARTS_RE.fullmatch(datetime_str)
+        if not match:
+            return None
+
+        month_name, day, year, hour, minute, meridiem = match.groups()
+        month = _MONTHS.get(month_name.lower())
+        hour, minute = int(hour), int(minute)
+        if month is None or not 1 <= hour <= 12 or minute > 59:
+            return None
+
+        hour = hour % 12 + (12 if meridiem == 'p' else 0)
+        try:
+            return datetime(int(year), month, int(day), hour, minute)
+        except ValueError:
+            return None
+
     def _strategy_generic_articles(self, soup: BeautifulSoup) -> List[Dict]:
         """
         Extract headlines from generic '<article>' blocks.
@@ -370,6 +510,7 @@ class CoindeskScraper(BaseScraper):
         """
         headlines = []
         articles = soup.find_all('article')
+        now = datetime.now()
 
         for article in articles:
             try:
@@ -379,14 +520,18 @@ class CoindeskScraper(BaseScraper):
                 best_text = ""
 
                 for link in links:
-                    text = self._clean_text(link.get_text())
+                    raw_text = link.get_text()
+                    if len(raw_text) <= max(len(best_text), 15):
+                        continue
+
+                    text = self._clean_text(raw_text)
                     if len(text) > len(best_text) and len(text) > 15:
                         best_link = link
                         best_text = text
 
                 if best_link:
                     href = best_link.get('href', '')
-                    pub_date = self._safe_extract_date_from_url(href)
+                    pub_date = self._safe_extract_date_from_url(href, now)
 
                     headlines.append({
                         'title': best_text,
@@ -394,7 +539,7 @@ class CoindeskScraper(BaseScraper):
                         'summary': '',
                         'source': self.source_name,
                         'published_at': pub_date,
-                        'scraped_at': datetime.now(),
+                        'scraped_at': now,
                         'bitcoin_related': self._is_bitcoin_related(best_text)
                     })
             except Exception as e:
@@ -411,11 +556,15 @@ class CoindeskScraper(BaseScraper):
         """
         headlines = []
         heading_tags = soup.find_all(['h1', 'h2', 'h3', 'h4'])
+        now = datetime.now()
 
         for heading in heading_tags:
             try:
-                text = self._clean_text(heading.get_text())
+                raw_text = heading.get_text()
+                if len(raw_text) < 15:
+                    continue
 
+                text = self._clean_text(raw_text)
                 if not text or len(text) < 15:
                     continue
 
@@ -424,9 +573,9 @@ class CoindeskScraper(BaseScraper):
                 if link:
                     href = link.get('href', '')
                     url = self._build_absolute_url(href)
-                    pub_date = self._safe_extract_date_from_url(href)
+                    pub_date = self._safe_extract_date_from_url(href, now)
                 else:
-                    pub_date = datetime.now()
+                    pub_date = now
 
                 headlines.append({
                     'title': text,
@@ -434,7 +583,7 @@ class CoindeskScraper(BaseScraper):
                     'summary': '',
                     'source': self.source_name,
                     'published_at': pub_date,
-                    'scraped_at': datetime.now(),
+                    'scraped_at': now,
                     'bitcoin_related': self._is_bitcoin_related(text)
                 })
             except Exception as e:
@@ -8,11 +8,19 @@ Created by: Renesh Ravi
 """
 
 import logging
+import numpy as np
+import orjson
 import requests
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
 import time
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from typing import List, Dict, Optional
 
+from .ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,8 +32,14 @@ class BitcoinPriceFetcher:
     requiring authentication. Rate limited to ~50 requests per minute.
     """
     
-    def __init__(self):
-        """Initialize the Bitcoin price fetcher"""
+    def __init__(self, cache_ttl: float = 3600):
+        """
+        Initialize the Bitcoin price fetcher
+
+        Args:
+            cache_ttl: Seconds to reuse historical price data before
+                       fetching it again (daily data changes at most once a day)
+        """
         
         # CoinGecko API base URL
         self.base_url = "https://api.coingecko.com/api/v3"
@@ -35,13 +49,32 @@ class BitcoinPriceFetcher:
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/json',
-            'User-Agent': 'bitcoin-sentiment-analyzer/1.0'
+            'User-Agent': 'bitcoin-sentiment-analyzer/1.0',
+            'Accept-Encoding': ACCEPT_ENCODING
         })
         
+        # Retry dropped connections and transient 5xx responses at the
+        # transport level, reusing the pooled keep-alive connection
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET'])
+        )
+        self.session.mount('https://', HTTPAdapter(max_retries=retry))
+        
         # Rate limiting configuration
         # CoinGecko free tier: ~50 requests per minute
         self.request_delay = 1.2  # Wait 1.2 seconds between requests
-        self.last_request_time = 0
+        self.request_timeout = 10  # Seconds to wait for each response
+        # Earliest monotonic time the next request may start. Callers on
+        # different threads reserve their slot under the lock.
+        self._next_request_time = 0.0
+        self._rate_lock = threading.Lock()
+        
+        # Historical prices cached per `days` value
+        self.cache_ttl = cache_ttl
+        self._history_cache = TTLCache(maxsize=16, ttl=cache_ttl)
         
         logger.info("BitcoinPriceFetcher initialized with CoinGecko API")
     
@@ -60,11 +93,13 @@ class BitcoinPriceFetcher:
         """
         
         # Enforce rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        with self._rate_lock:
+            current_time = time.monotonic()
+            sleep_time = self._next_request_time - current_time
+            self._next_request_time = (max(current_time, self._next_request_time)
+                                       + self.request_delay)
         
-        if time_since_last < self.request_delay:
-            sleep_time = self.request_delay - time_since_last
+        if sleep_time > 0:
             logger.debug(f"Rate limiting: sleeping {sleep_time:.2f}s")
             time.sleep(sleep_time)
         
@@ -73,14 +108,17 @@ class BitcoinPriceFetcher:
         
         try:
             # Make the HTTP GET request
-            response = self.session.get(url, params=params, timeout=10)
-            self.last_request_time = time.time()
+            response = self.session.get(url, params=params, timeout=self.request_timeout)
+            
+            if response.status_code == 429:
+                self._defer_after_rate_limit(response)
             
             # Check for HTTP errors (4xx, 5xx status codes)
             response.raise_for_status()
             
-            # Parse and return JSON
-            return response.json()
+            # Parse and return JSON; orjson reads the body bytes directly
+            # instead of decoding them to text first
+            return orjson.loads(response.content)
             
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error for {url}: {e}")
@@ -92,6 +130,26 @@ class BitcoinPriceFetcher:
             logger.error(f"Invalid JSON response from {url}: {e}")
             return None
     
+    def _defer_after_rate_limit(self, response: requests.Response):
+        """
+        Push the next request back after CoinGecko answers 429
+        
+        Args:
+            response: The rate-limited response; its Retry-After header
+                      (in seconds) is honored when present
+        """
+        
+        try:
+            retry_after = float(response.headers.get('Retry-After', ''))
+        except ValueError:
+            retry_after = self.request_delay
+        
+        with self._rate_lock:
+            self._next_request_time = max(self._next_request_time,
+                                          time.monotonic() + retry_after)
+        
+        logger.warning(f"Rate limited by CoinGecko, pausing requests for {retry_after:.0f}s")
+    
     def get_current_price(self) -> Optional[float]:
         """
         Get the current Bitcoin price in USD
@@ -156,6 +214,31 @@ class BitcoinPriceFetcher:
             logger.warning(f"Requested {days} days, capping at 365 for free API")
             days = 365
         
+        cached = self._history_cache.get(days)
+        
+        if cached is not None:
+            logger.debug(f"Using cached {days}-day price data")
+            return cached
+        
+        price_data = self._fetch_historical_prices(days)
+        
+        # Only cache successful fetches so failures are retried next call
+        if price_data:
+            self._history_cache.set(days, price_data)
+        
+        return price_data
+    
+    def _fetch_historical_prices(self, days: int) -> List[Dict]:
+        """
+        Fetch daily historical prices from CoinGecko, bypassing the cache
+        
+        Args:
+            days: Number of days of historical data (already capped at 365)
+        
+        Returns:
+            List of daily price dictionaries, or an empty list on failure
+        """
+        
         logger.info(f"Fetching {days} days of historical Bitcoin prices")
         
         # Call CoinGecko market chart endpoint
@@ -173,9 +256,9 @@ class BitcoinPriceFetcher:
         price_data = []
         
         for timestamp_ms, price in data['prices']:
-            # Convert Unix timestamp (milliseconds) to date
-            date_obj = datetime.fromtimestamp(timestamp_ms / 1000)
-            date_str = date_obj.strftime('%Y-%m-%d')
+            # Convert Unix timestamp (milliseconds) to a local date; building
+            # a date and isoformat() skips the time fields and strftime
+            date_str = date.fromtimestamp(timestamp_ms / 1000).isoformat()
             
             price_data.append({
                 'date': date_str,
@@ -218,27 +301,23 @@ class BitcoinPriceFetcher:
             logger.warning("Insufficient price data for statistics")
             return {}
         
-        prices = [p['price'] for p in price_data]
-        dates = [p['date'] for p in price_data]
+        prices = np.fromiter((p['price'] for p in price_data),
+                             dtype=np.float64, count=len(price_data))
         
         # Basic price statistics
-        current_price = prices[-1]
-        start_price = prices[0]
-        min_price = min(prices)
-        max_price = max(prices)
-        avg_price = sum(prices) / len(prices)
+        current_price = float(prices[-1])
+        start_price = float(prices[0])
+        min_price = float(prices.min())
+        max_price = float(prices.max())
+        avg_price = float(prices.mean())
         
         # Calculate price change over period
         total_change = current_price - start_price
         total_change_percent = (total_change / start_price) * 100
         
-        # Calculate daily changes
-        daily_changes = []
-        for i in range(1, len(prices)):
-            change_percent = ((prices[i] - prices[i-1]) / prices[i-1]) * 100
-            daily_changes.append(change_percent)
-        
-        avg_daily_change = sum(daily_changes) / len(daily_changes) if daily_changes else 0
+        # Daily percent changes in one vectorized step
+        daily_changes = np.diff(prices) / prices[:-1] * 100
+        avg_daily_change = float(daily_changes.mean())
         
         # Calculate volatility (price range as percentage of average)
         volatility = ((max_price - min_price) / avg_price) * 100
@@ -255,7 +334,7 @@ class BitcoinPriceFetcher:
             'total_change_percent': total_change_percent,
             'avg_daily_change_percent': avg_daily_change,
             'volatility_percent': volatility,
-            'date_range': f"{dates[0]} to {dates[-1]}"
+            'date_range': f"{price_data[0]['date']} to {price_data[-1]['date']}"
         }
         
         logger.info(f"Price statistics calculated for {days} days")
@@ -0,0 +1,123 @@
+"""
+orjson-backed JSON provider for Flask
+
+Serializes API responses with orjson, which is several times faster than the
+standard library json module on large headline payloads and understands
+numpy scalars/arrays natively, so routes can return analysis results without
+casting every value to a Python type first.
+
+Created by: Renesh Ravi
+"""
+
+from typing import Dict, Iterator
+
+import numpy as np
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# numpy scalars/arrays are emitted directly; non-string dict keys (e.g. dates
+# from a groupby) are converted instead of raising
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# json.dumps arguments that orjson can honour (see ORJSONProvider.dumps)
+_ORJSON_DUMPS_KWARGS = {'default', 'sort_keys', 'indent', 'separators',
+                        'ensure_ascii'}
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that uses orjson for dumps, loads and jsonify
+
+    Install with `app.json = ORJSONProvider(app)`. Calls with options orjson
+    can't reproduce fall back to Flask's standard library provider.
+    """
+
+    # Match orjson's output when falling back to the standard library
+    ensure_ascii = False
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        """
+        Convert numpy values for the standard library fallback, and
+        everything else the way Flask does
+        """
+        if isinstance(o, (np.generic, np.ndarray)):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs) -> str:
+        """
+        Serialize obj to a JSON string
+
+        default, sort_keys and indent=2 map onto orjson options; anything
+        orjson can't reproduce (other indents or separators, ensure_ascii,
+        unknown arguments) goes through json.dumps instead
+        """
+        indent = kwargs.get('indent')
+        separators = (',', ': ') if indent else (',', ':')
+
+        if (kwargs.keys() <= _ORJSON_DUMPS_KWARGS and indent in (None, 2)
+                and not kwargs.get('ensure_ascii')
+                and tuple(kwargs.get('separators') or separators) == separators):
+            option = ORJSON_OPTIONS
+            if kwargs.get('sort_keys'):
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=kwargs.get('default'),
+                                option=option).decode()
+
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize a JSON string or bytes, through json.loads if it is
+        given options
+        """
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Build a JSON response, writing orjson's bytes straight into the body
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
+
+
+def iter_json_with_list(obj: Dict, list_key: str, chunk_size: int = 64) -> Iterator[bytes]:
+    """
+    Yield obj serialized as JSON, emitting obj[list_key] a chunk at a time
+
+    The other fields are written first, then the list items are serialized
+    `chunk_size` at a time, so a large list can be streamed to the client
+    without first building the whole document in memory.
+
+    Args:
+        obj: Top-level dictionary to serialize
+        list_key: Key of the (large) list to stream
+        chunk_size: Number of list items serialized per yielded chunk
+
+    Returns:
+        Iterator of JSON byte chunks that concatenate to one document
+    """
+    items = obj[list_key]
+    head = orjson.dumps({k: v for k, v in obj.items() if k != list_key},
+                        option=ORJSON_OPTIONS)
+
+    # Reopen the serialized head object and start the list field
+    separator = b',' if len(head) > 2 else b''
+    yield head[:-1] + separator + orjson.dumps(list_key) + b':['
+
+    for start in range(0, len(items), chunk_size):
+        chunk = orjson.dumps(items[start:start + chunk_size], option=ORJSON_OPTIONS)
+        # Drop the chunk's own brackets and join it onto the previous one
+        yield (b',' if start else b'') + chunk[1:-1]
+
+    yield b']}'
+
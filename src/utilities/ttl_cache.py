@@ -0,0 +1,76 @@
+"""
+Small thread-safe TTL cache
+
+Keeps up to `maxsize` entries for `ttl` seconds each, evicting the least
+recently used entry first. Used to avoid repeating slow network/model work
+for identical requests.
+
+Created by: Renesh Ravi
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded key/value cache whose entries expire after a fixed time
+
+    All operations take an internal lock, so one instance can be shared
+    between request threads.
+    """
+
+    def __init__(self, maxsize: int = 16, ttl: float = 3600):
+        """
+        Initialize an empty cache
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the least
+                recently used
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing or expired
+
+        A hit marks the entry as recently used; its expiry still counts from
+        when it was stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Store value under key, evicting the least recently used
+        entries if over maxsize
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic(), value)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        with self._lock:
+            self._entries.clear()